@@ -2,86 +2,149 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import os
+import re
+import shutil
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
 
 GO_VERSION = "1.25"
+SUPPORTED_KINDS = ("http", "grpc", "worker", "cli")
+_PLACEHOLDER_KINDS: frozenset[str] = frozenset({"grpc", "worker", "cli"})
 
+_PLACEHOLDER_RE = re.compile(r"REPLACE_(?:MODULE|DEBUG_IMPORT|DEBUG_FIELD)")
+_MODULE_RE = re.compile(rb"(?m)^\s*module\s+(\S+)")
 
-@dataclass
+
+@dataclass(frozen=True)
 class Options:
     root: Path
+    svc: Path
+    adapter_in: Path
     module: str | None
     service: str
     kinds: tuple[str, ...]
+    kinds_set: frozenset[str]
     http_framework: str
     http_pprof: bool
     http_trace: bool
     skip_deps: bool
+    go_mod_created: bool
+
+
+class WriteBatch:
+    """Collects generated files and writes them to disk in a single pass."""
+
+    def __init__(self) -> None:
+        self._files: list[tuple[Path, str | Callable[[], str], bool]] = []
+        self._mkdirs: set[Path] = set()
+
+    def add(self, path: Path, content: str | Callable[[], str], skip_if_exists: bool = False) -> None:
+        self._files.append((path, content, skip_if_exists))
+        self._mkdirs.add(path.parent)
+
+    def add_dir(self, path: Path) -> None:
+        self._mkdirs.add(path)
+
+    def flush(self) -> None:
+        # mkdir(parents=True) creates intermediate directories, so only leaves need a call.
+        ancestors = {parent for directory in self._mkdirs for parent in directory.parents}
+        for directory in self._mkdirs - ancestors:
+            directory.mkdir(parents=True, exist_ok=True)
+        for path, content, skip_if_exists in self._files:
+            # O_EXCL create: the existence check and the open are one syscall.
+            flags = os.O_WRONLY | os.O_CREAT | (os.O_EXCL if skip_if_exists else os.O_TRUNC)
+            try:
+                fd = os.open(path, flags, 0o666)
+            except FileExistsError:
+                continue
+            try:
+                if callable(content):
+                    content = content()
+                data = memoryview(content.encode("utf-8"))
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+        self._files.clear()
+        self._mkdirs.clear()
+
+
+_BATCH = WriteBatch()
 
 
 def _write(path: Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    _BATCH.add(path, content)
 
 
-def _write_if_missing(path: Path, content: str) -> None:
-    if path.exists():
-        return
-    _write(path, content)
+def _render(template: str, **subs: str) -> str:
+    return _PLACEHOLDER_RE.sub(lambda m: subs[m.group(0)], template)
 
 
-def _maybe_write_go_mod(root: Path, module: str | None) -> bool:
-    if module is None:
-        return False
-    go_mod = root / "go.mod"
-    if go_mod.exists():
-        return False
-    _write(
-        go_mod,
-        f"module {module}\n\ngo {GO_VERSION}\n",
-    )
-    return True
+def _ensure_dir(path: Path) -> None:
+    _BATCH.add_dir(path)
 
 
-def _install_deps_for_new_project(root: Path) -> None:
+def _write_if_missing_lazy(path: Path, render: Callable[[], str]) -> None:
+    # Templates are rendered only if the file can be created at flush time.
+    _BATCH.add(path, render, skip_if_exists=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _go_env(root: Path) -> dict[str, str]:
     env = os.environ.copy()
-    env["GOCACHE"] = str(root / ".gocache")
-    env["GOMODCACHE"] = str(root / ".gomodcache")
+    # Project-local caches by default; an exported cache (e.g. a warm shared one) wins.
+    env.setdefault("GOCACHE", os.fspath(root / ".gocache"))
+    env.setdefault("GOMODCACHE", os.fspath(root / ".gomodcache"))
+    return env
 
-    try:
-        proc = subprocess.run(
-            ["go", "mod", "tidy"],
-            cwd=root,
-            env=env,
-            check=False,
-        )
-    except FileNotFoundError:
+
+def _install_deps_for_new_project(root: Path) -> None:
+    if shutil.which("go") is None:
         print("⚠️  go not found; skipping dependency install")
         return
 
+    # `go mod tidy` resolves requirements from the generated imports, so it
+    # must run after the batch is flushed rather than overlap with it.
+    proc = subprocess.run(
+        ["go", "mod", "tidy"],
+        cwd=root,
+        env=_go_env(root),
+        check=False,
+    )
+
     if proc.returncode != 0:
         print("⚠️  go mod tidy failed (likely no network access); run `go mod tidy` later in an online environment.")
 
-def _discover_module_from_go_mod(root: Path) -> str | None:
+def _read_or_create_go_mod(root: Path, module: str | None) -> tuple[str | None, bool]:
+    """Return the module path and whether go.mod already existed; queue go.mod if missing."""
     go_mod = root / "go.mod"
-    if not go_mod.exists():
-        return None
-    for line in go_mod.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line.startswith("module "):
-            return line.removeprefix("module ").strip()
-    return None
-
+    try:
+        data = go_mod.read_bytes()
+    except FileNotFoundError:
+        # Default to local module path based on folder name (avoid assuming github.com-style paths).
+        module = module or root.name
+        _write(
+            go_mod,
+            f"module {module}\n\ngo {GO_VERSION}\n",
+        )
+        return module, False
 
-def _svc(root: Path) -> Path:
-    return root / "internal"
+    if module is None:
+        match = _MODULE_RE.search(data)
+        if match:
+            module = match.group(1).decode("utf-8")
+    return module, True
 
 
 def _base_tree(opt: Options) -> None:
+    if opt.module is None:
+        raise SystemExit("Go module path not set; pass --module or run inside an existing module (go.mod).")
+
     required = [
         "internal/domain",
         "internal/app",
@@ -93,13 +156,13 @@ def _base_tree(opt: Options) -> None:
         "internal/app/settings",
         "internal/bootstrap",
     ]
-    if "grpc" in opt.kinds:
+    if "grpc" in opt.kinds_set:
         required.append(f"api/proto/{opt.service}/v1")
-    if "http" in opt.kinds:
+    if "http" in opt.kinds_set:
         required.append("test")
 
     for rel in required:
-        (opt.root / rel).mkdir(parents=True, exist_ok=True)
+        _ensure_dir(opt.root / rel)
 
     _write_project_docs(opt)
 
@@ -112,7 +175,7 @@ def _base_tree(opt: Options) -> None:
 
 def _write_settings_port(opt: Options) -> None:
     _write(
-        _svc(opt.root) / "port" / "out" / "settings.go",
+        opt.svc / "port" / "out" / "settings.go",
         """package out
 
 type Settings struct {
@@ -136,7 +199,7 @@ type SettingsRepository interface {
 
 def _write_env_adapter(opt: Options) -> None:
     _write(
-        _svc(opt.root) / "adapter" / "out" / "env" / "env.go",
+        opt.svc / "adapter" / "out" / "env" / "env.go",
         """package env
 
 import (
@@ -162,13 +225,13 @@ func stringOr(key, fallback string) string {
 	}
 	return fallback
 }
-""",
+""".replace("REPLACE_MODULE", opt.module),
     )
 
 
 def _write_settings_repo(opt: Options) -> None:
     _write(
-        _svc(opt.root) / "app" / "settings" / "repository.go",
+        opt.svc / "app" / "settings" / "repository.go",
         """package settings
 
 import portout "REPLACE_MODULE/internal/port/out"
@@ -195,39 +258,11 @@ func (r *Repository) Reload() portout.Settings {
 	r.settings = r.reader.Load()
 	return r.settings
 }
-""",
+""".replace("REPLACE_MODULE", opt.module),
     )
 
 
-def _write_project_docs(opt: Options) -> None:
-    binaries = []
-    for kind in opt.kinds:
-        if kind == "http":
-            binaries.append(f"- `cmd/{opt.service}-api`: HTTP server (Echo default)")
-        elif kind == "grpc":
-            binaries.append(f"- `cmd/{opt.service}-grpc`: gRPC server")
-        elif kind == "worker":
-            binaries.append(f"- `cmd/{opt.service}-worker`: background worker")
-        elif kind == "cli":
-            binaries.append(f"- `cmd/{opt.service}-cli`: CLI")
-
-    binaries_block = "\n".join(binaries) if binaries else "- (none scaffolded)"
-    debug_section = ""
-    env_pprof = ""
-    if "http" in opt.kinds and (opt.http_pprof or opt.http_trace):
-        debug_section = """
-## Debug endpoints (optional)
-
-When scaffolded with `--http-pprof` and/or `--http-trace`, these are served by a separate debug HTTP server when `PPROF_PORT` is set:
-
-- `GET http://$PPROF_ADDR:$PPROF_PORT/debug/pprof/` (pprof index)
-- `GET http://$PPROF_ADDR:$PPROF_PORT/debug/pprof/trace` (execution trace)
-"""
-        env_pprof = "\n- `PPROF_ADDR` (optional; default `127.0.0.1`)\n- `PPROF_PORT` (optional; enables debug server on `$PPROF_ADDR:<port>`)"
-
-    _write_if_missing(
-        opt.root / "README.md",
-        f"""# {opt.service}
+_README_MD = """# {service}
 
 Go service scaffold using hexagonal (ports-and-adapters) architecture.
 
@@ -244,19 +279,17 @@ Go service scaffold using hexagonal (ports-and-adapters) architecture.
 ## Local run (HTTP)
 
 ```bash
-go run ./cmd/{opt.service}-api
+go run ./cmd/{service}-api
 ```
 
 Environment:
 
 - `HTTP_ADDR` (default `:8080`)
 - `LOG_LEVEL` (e.g. `info`, `debug`){env_pprof}
-""",
-    )
+"""
 
-    _write_if_missing(
-        opt.root / "AGENTS.md",
-        f"""# Agent Instructions
+
+_AGENTS_MD = """# Agent Instructions
 
 This repository follows Go best practices and hexagonal (ports-and-adapters / “jexagonal”) architecture.
 
@@ -287,10 +320,10 @@ The scaffolder creates only what you asked for, but these are the standard direc
 ├── AGENTS.md
 ├── README.md
 ├── cmd/
-│   ├── {opt.service}-api/          # HTTP server (Echo default)
-│   ├── {opt.service}-grpc/         # gRPC server (optional)
-│   ├── {opt.service}-worker/       # worker/consumer/scheduler (optional)
-│   └── {opt.service}-cli/          # CLI tool (optional)
+│   ├── {service}-api/          # HTTP server (Echo default)
+│   ├── {service}-grpc/         # gRPC server (optional)
+│   ├── {service}-worker/       # worker/consumer/scheduler (optional)
+│   └── {service}-cli/          # CLI tool (optional)
 ├── internal/
 │   ├── domain/                      # Entities/value objects/invariants
 │   ├── app/                         # Use-cases (application services)
@@ -347,20 +380,12 @@ The scaffolder creates only what you asked for, but these are the standard direc
 - Format with `gofmt`.
 - Keep imports tidy (`goimports` if available, otherwise `gofmt` + manual cleanup).
 - Avoid long-lived contexts without cancellation; respect shutdown signals in `cmd/*`.
-""",
-    )
+"""
 
-    make_run_target = f"{opt.service}-api"
-    if "worker" in opt.kinds:
-        make_run_target = f"{opt.service}-worker"
-    if "http" in opt.kinds:
-        make_run_target = f"{opt.service}-api"
 
-    _write_if_missing(
-        opt.root / "Makefile",
-        f""".PHONY: help tidy fmt test build run
+_MAKEFILE = """.PHONY: help tidy fmt test build run
 
-SERVICE ?= {opt.service}
+SERVICE ?= {service}
 BINARY ?= {make_run_target}
 
 help:
@@ -381,23 +406,63 @@ build:
 
 run:
 \tgo run ./cmd/$(BINARY)
-""",
+"""
+
+
+def _write_project_docs(opt: Options) -> None:
+    binaries = []
+    for kind in opt.kinds:
+        if kind == "http":
+            binaries.append(f"- `cmd/{opt.service}-api`: HTTP server (Echo default)")
+        elif kind == "grpc":
+            binaries.append(f"- `cmd/{opt.service}-grpc`: gRPC server")
+        elif kind == "worker":
+            binaries.append(f"- `cmd/{opt.service}-worker`: background worker")
+        elif kind == "cli":
+            binaries.append(f"- `cmd/{opt.service}-cli`: CLI")
+
+    binaries_block = "\n".join(binaries) if binaries else "- (none scaffolded)"
+    debug_section = ""
+    env_pprof = ""
+    if "http" in opt.kinds_set and (opt.http_pprof or opt.http_trace):
+        debug_section = """
+## Debug endpoints (optional)
+
+When scaffolded with `--http-pprof` and/or `--http-trace`, these are served by a separate debug HTTP server when `PPROF_PORT` is set:
+
+- `GET http://$PPROF_ADDR:$PPROF_PORT/debug/pprof/` (pprof index)
+- `GET http://$PPROF_ADDR:$PPROF_PORT/debug/pprof/trace` (execution trace)
+"""
+        env_pprof = "\n- `PPROF_ADDR` (optional; default `127.0.0.1`)\n- `PPROF_PORT` (optional; enables debug server on `$PPROF_ADDR:<port>`)"
+
+    _write_if_missing_lazy(
+        opt.root / "README.md",
+        lambda: _README_MD.format(
+            service=opt.service,
+            binaries_block=binaries_block,
+            debug_section=debug_section,
+            env_pprof=env_pprof,
+        ),
     )
 
+    _write_if_missing_lazy(
+        opt.root / "AGENTS.md",
+        lambda: _AGENTS_MD.format(service=opt.service),
+    )
 
-def _write_bootstrap_compose(opt: Options) -> None:
-    if opt.module is None:
-        raise SystemExit("Go module path not set; pass --module or run inside an existing module (go.mod).")
+    make_run_target = f"{opt.service}-api"
+    if "worker" in opt.kinds_set:
+        make_run_target = f"{opt.service}-worker"
+    if "http" in opt.kinds_set:
+        make_run_target = f"{opt.service}-api"
+
+    _write_if_missing_lazy(
+        opt.root / "Makefile",
+        lambda: _MAKEFILE.format(service=opt.service, make_run_target=make_run_target),
+    )
 
-    if "http" in opt.kinds and opt.http_framework == "echo":
-        debug_import = ""
-        debug_field = ""
-        if opt.http_pprof or opt.http_trace:
-            debug_import = '\n\tdebughttp "REPLACE_MODULE/internal/adapter/in/debughttp"'
-            debug_field = f"\n\t\tDebugHTTPHandler: debughttp.Handler(debughttp.Options{{Pprof: {str(opt.http_pprof).lower()}, Trace: {str(opt.http_trace).lower()}}}),"
-        _write(
-            _svc(opt.root) / "bootstrap" / "compose.go",
-            """package bootstrap
+
+_COMPOSE_GO_ECHO = """package bootstrap
 
 import (
 	"net/http"
@@ -458,20 +523,8 @@ func newLogger(logLevel string) *logrus.Logger {
 	return l
 }
 """
-            .replace("REPLACE_DEBUG_IMPORT", debug_import)
-            .replace("REPLACE_DEBUG_FIELD", debug_field),
-        )
-        return
 
-    if "http" in opt.kinds and opt.http_framework == "nethttp":
-        debug_import = ""
-        debug_field = ""
-        if opt.http_pprof or opt.http_trace:
-            debug_import = '\n\tdebughttp "REPLACE_MODULE/internal/adapter/in/debughttp"'
-            debug_field = f"\n\t\tDebugHTTPHandler: debughttp.Handler(debughttp.Options{{Pprof: {str(opt.http_pprof).lower()}, Trace: {str(opt.http_trace).lower()}}}),"
-        _write(
-            _svc(opt.root) / "bootstrap" / "compose.go",
-            """package bootstrap
+_COMPOSE_GO_NETHTTP = """package bootstrap
 
 import (
 	"net/http"
@@ -528,14 +581,8 @@ func newLogger(logLevel string) *logrus.Logger {
 	return l
 }
 """
-            .replace("REPLACE_DEBUG_IMPORT", debug_import)
-            .replace("REPLACE_DEBUG_FIELD", debug_field),
-        )
-        return
 
-    _write(
-        _svc(opt.root) / "bootstrap" / "compose.go",
-        """package bootstrap
+_COMPOSE_GO = """package bootstrap
 
 import (
 	"os"
@@ -582,15 +629,38 @@ func newLogger(logLevel string) *logrus.Logger {
 	}
 	return l
 }
-""",
+"""
+
+# compose.go template keyed by HTTP framework (None when no HTTP binary is scaffolded).
+_COMPOSE_TEMPLATES: dict[str | None, str] = {
+    "echo": _COMPOSE_GO_ECHO,
+    "nethttp": _COMPOSE_GO_NETHTTP,
+    None: _COMPOSE_GO,
+}
+
+
+def _write_bootstrap_compose(opt: Options) -> None:
+    has_http = "http" in opt.kinds_set
+    template = _COMPOSE_TEMPLATES[opt.http_framework if has_http else None]
+    debug_import = ""
+    debug_field = ""
+    if has_http and (opt.http_pprof or opt.http_trace):
+        debug_import = f'\n\tdebughttp "{opt.module}/internal/adapter/in/debughttp"'
+        debug_field = f"\n\t\tDebugHTTPHandler: debughttp.Handler(debughttp.Options{{Pprof: {str(opt.http_pprof).lower()}, Trace: {str(opt.http_trace).lower()}}}),"
+    _write(
+        opt.svc / "bootstrap" / "compose.go",
+        _render(
+            template,
+            REPLACE_MODULE=opt.module,
+            REPLACE_DEBUG_IMPORT=debug_import,
+            REPLACE_DEBUG_FIELD=debug_field,
+        ),
     )
 
 
 def _write_http_debug_pprof(opt: Options) -> None:
-    if opt.module is None:
-        return
     _write(
-        _svc(opt.root) / "adapter" / "in" / "debughttp" / "pprof.go",
+        opt.adapter_in / "debughttp" / "pprof.go",
         """package debughttp
 
 import (
@@ -620,91 +690,7 @@ func Handler(opt Options) http.Handler {
     )
 
 
-def _scaffold_http_nethttp(opt: Options) -> None:
-    if opt.module is None:
-        raise SystemExit("--module is required when scaffolding --kinds http (Go imports need a module path).")
-    (opt.root / "cmd" / f"{opt.service}-api").mkdir(parents=True, exist_ok=True)
-    (_svc(opt.root) / "adapter" / "in" / "http").mkdir(parents=True, exist_ok=True)
-    (_svc(opt.root) / "adapter" / "in" / "http" / "middleware").mkdir(parents=True, exist_ok=True)
-    if opt.http_pprof or opt.http_trace:
-        (_svc(opt.root) / "adapter" / "in" / "debughttp").mkdir(parents=True, exist_ok=True)
-        _write_http_debug_pprof(opt)
-
-    _write(
-        _svc(opt.root) / "adapter" / "in" / "http" / "router.go",
-        """package http
-
-import (
-	"net/http"
-
-	"github.com/sirupsen/logrus"
-
-	"REPLACE_MODULE/internal/adapter/in/http/middleware"
-)
-
-type Router struct {
-	Logger logrus.FieldLogger
-}
-
-func (r Router) Handler() http.Handler {
-	mux := http.NewServeMux()
-	mux.HandleFunc("/health/live", func(w http.ResponseWriter, _ *http.Request) { w.WriteHeader(http.StatusOK) })
-	mux.HandleFunc("/health/ready", func(w http.ResponseWriter, _ *http.Request) { w.WriteHeader(http.StatusOK) })
-	return middleware.RequestLogger(r.Logger, mux)
-}
-""",
-    )
-    _write(
-        _svc(opt.root) / "adapter" / "in" / "http" / "middleware" / "logging.go",
-        """package middleware
-
-import (
-	"net/http"
-	"time"
-
-	"github.com/sirupsen/logrus"
-)
-
-type statusCapturingResponseWriter struct {
-	http.ResponseWriter
-	status int
-	bytes  int
-}
-
-func (w *statusCapturingResponseWriter) WriteHeader(statusCode int) {
-	w.status = statusCode
-	w.ResponseWriter.WriteHeader(statusCode)
-}
-
-func (w *statusCapturingResponseWriter) Write(p []byte) (int, error) {
-	if w.status == 0 {
-		w.status = http.StatusOK
-	}
-	n, err := w.ResponseWriter.Write(p)
-	w.bytes += n
-	return n, err
-}
-
-func RequestLogger(logger logrus.FieldLogger, next http.Handler) http.Handler {
-	if logger == nil {
-		logger = logrus.StandardLogger()
-	}
-	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
-		start := time.Now()
-		cw := &statusCapturingResponseWriter{ResponseWriter: w}
-		next.ServeHTTP(cw, r)
-		logger.WithFields(logrus.Fields{
-			"method":   r.Method,
-			"path":     r.URL.Path,
-			"status":   cw.status,
-			"bytes":    cw.bytes,
-			"duration": time.Since(start).String(),
-		}).Info("http_request")
-	})
-}
-""",
-    )
-    main_go = """package main
+_MAIN_GO_NETHTTP = """package main
 
 import (
 	"context"
@@ -747,8 +733,7 @@ func shutdownSignal() <-chan os.Signal {
 }
 """
 
-    if opt.http_pprof or opt.http_trace:
-        main_go = """package main
+_MAIN_GO_NETHTTP_DEBUG = """package main
 
 import (
 	"context"
@@ -824,76 +809,96 @@ func shutdownSignal() <-chan os.Signal {
 }
 """
 
-    _write(
-        opt.root / "cmd" / f"{opt.service}-api" / "main.go",
-        main_go,
-    )
-    _write_health_tests(opt)
-
 
-def _scaffold_http_echo(opt: Options) -> None:
-    if opt.module is None:
-        raise SystemExit("--module is required when scaffolding --kinds http (Go imports need a module path).")
-    (opt.root / "cmd" / f"{opt.service}-api").mkdir(parents=True, exist_ok=True)
-    (_svc(opt.root) / "adapter" / "in" / "http").mkdir(parents=True, exist_ok=True)
+def _scaffold_http_nethttp(opt: Options) -> None:
+    http_dir = opt.adapter_in / "http"
     if opt.http_pprof or opt.http_trace:
-        (_svc(opt.root) / "adapter" / "in" / "debughttp").mkdir(parents=True, exist_ok=True)
         _write_http_debug_pprof(opt)
 
     _write(
-        _svc(opt.root) / "adapter" / "in" / "http" / "server.go",
+        http_dir / "router.go",
         """package http
 
 import (
 	"net/http"
 
-	"github.com/labstack/echo/v4"
-	echomw "github.com/labstack/echo/v4/middleware"
 	"github.com/sirupsen/logrus"
+
+	"REPLACE_MODULE/internal/adapter/in/http/middleware"
 )
 
-func New(logger *logrus.Logger) *echo.Echo {
-	e := echo.New()
-	if logger == nil {
-		logger = logrus.New()
-	}
-	e.HideBanner = true
+type Router struct {
+	Logger logrus.FieldLogger
+}
 
-	e.Use(echomw.RequestLoggerWithConfig(echomw.RequestLoggerConfig{
-		LogStatus:   true,
-		LogMethod:   true,
-		LogURI:      true,
-		LogLatency:  true,
-		LogError:    true,
-		LogValuesFunc: func(c echo.Context, v echomw.RequestLoggerValues) error {
-			entry := logger.WithFields(logrus.Fields{
-				"method":  v.Method,
-				"uri":     v.URI,
-				"status":  v.Status,
-				"latency": v.Latency.String(),
-			})
-			if v.Error != nil {
-				entry.WithError(v.Error).Error("http_request")
-				return nil
-			}
-			entry.Info("http_request")
-			return nil
-		},
-	}))
+func (r Router) Handler() http.Handler {
+	mux := http.NewServeMux()
+	mux.HandleFunc("/health/live", func(w http.ResponseWriter, _ *http.Request) { w.WriteHeader(http.StatusOK) })
+	mux.HandleFunc("/health/ready", func(w http.ResponseWriter, _ *http.Request) { w.WriteHeader(http.StatusOK) })
+	return middleware.RequestLogger(r.Logger, mux)
+}
+""".replace("REPLACE_MODULE", opt.module),
+    )
+    _write(
+        http_dir / "middleware" / "logging.go",
+        """package middleware
 
-	e.GET("/health/live", func(c echo.Context) error {
-		return c.NoContent(http.StatusOK)
-	})
-	e.GET("/health/ready", func(c echo.Context) error {
-		return c.NoContent(http.StatusOK)
-	})
+import (
+	"net/http"
+	"time"
 
-	return e
+	"github.com/sirupsen/logrus"
+)
+
+type statusCapturingResponseWriter struct {
+	http.ResponseWriter
+	status int
+	bytes  int
+}
+
+func (w *statusCapturingResponseWriter) WriteHeader(statusCode int) {
+	w.status = statusCode
+	w.ResponseWriter.WriteHeader(statusCode)
+}
+
+func (w *statusCapturingResponseWriter) Write(p []byte) (int, error) {
+	if w.status == 0 {
+		w.status = http.StatusOK
+	}
+	n, err := w.ResponseWriter.Write(p)
+	w.bytes += n
+	return n, err
+}
+
+func RequestLogger(logger logrus.FieldLogger, next http.Handler) http.Handler {
+	if logger == nil {
+		logger = logrus.StandardLogger()
+	}
+	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		start := time.Now()
+		cw := &statusCapturingResponseWriter{ResponseWriter: w}
+		next.ServeHTTP(cw, r)
+		logger.WithFields(logrus.Fields{
+			"method":   r.Method,
+			"path":     r.URL.Path,
+			"status":   cw.status,
+			"bytes":    cw.bytes,
+			"duration": time.Since(start).String(),
+		}).Info("http_request")
+	})
 }
 """,
     )
+    main_go = _MAIN_GO_NETHTTP_DEBUG if (opt.http_pprof or opt.http_trace) else _MAIN_GO_NETHTTP
+
+    _write(
+        opt.root / "cmd" / f"{opt.service}-api" / "main.go",
+        main_go.replace("REPLACE_MODULE", opt.module),
+    )
+    _write_health_tests(opt)
 
-    main_go = """package main
+
+_MAIN_GO_ECHO = """package main
 
 import (
 	"context"
@@ -932,8 +937,7 @@ func shutdownSignal() <-chan os.Signal {
 }
 """
 
-    if opt.http_pprof or opt.http_trace:
-        main_go = """package main
+_MAIN_GO_ECHO_DEBUG = """package main
 
 import (
 	"context"
@@ -1005,16 +1009,74 @@ func shutdownSignal() <-chan os.Signal {
 }
 """
 
+
+def _scaffold_http_echo(opt: Options) -> None:
+    if opt.http_pprof or opt.http_trace:
+        _write_http_debug_pprof(opt)
+
+    _write(
+        opt.adapter_in / "http" / "server.go",
+        """package http
+
+import (
+	"net/http"
+
+	"github.com/labstack/echo/v4"
+	echomw "github.com/labstack/echo/v4/middleware"
+	"github.com/sirupsen/logrus"
+)
+
+func New(logger *logrus.Logger) *echo.Echo {
+	e := echo.New()
+	if logger == nil {
+		logger = logrus.New()
+	}
+	e.HideBanner = true
+
+	e.Use(echomw.RequestLoggerWithConfig(echomw.RequestLoggerConfig{
+		LogStatus:   true,
+		LogMethod:   true,
+		LogURI:      true,
+		LogLatency:  true,
+		LogError:    true,
+		LogValuesFunc: func(c echo.Context, v echomw.RequestLoggerValues) error {
+			entry := logger.WithFields(logrus.Fields{
+				"method":  v.Method,
+				"uri":     v.URI,
+				"status":  v.Status,
+				"latency": v.Latency.String(),
+			})
+			if v.Error != nil {
+				entry.WithError(v.Error).Error("http_request")
+				return nil
+			}
+			entry.Info("http_request")
+			return nil
+		},
+	}))
+
+	e.GET("/health/live", func(c echo.Context) error {
+		return c.NoContent(http.StatusOK)
+	})
+	e.GET("/health/ready", func(c echo.Context) error {
+		return c.NoContent(http.StatusOK)
+	})
+
+	return e
+}
+""",
+    )
+
+    main_go = _MAIN_GO_ECHO_DEBUG if (opt.http_pprof or opt.http_trace) else _MAIN_GO_ECHO
+
     _write(
         opt.root / "cmd" / f"{opt.service}-api" / "main.go",
-        main_go,
+        main_go.replace("REPLACE_MODULE", opt.module),
     )
     _write_health_tests(opt)
 
 
 def _write_health_tests(opt: Options) -> None:
-    if opt.module is None:
-        return
     _write(
         opt.root / "test" / "health_test.go",
         """package test
@@ -1056,35 +1118,27 @@ func TestHealthReady(t *testing.T) {
 		t.Fatalf("expected %d, got %d", http.StatusOK, rec.Code)
 	}
 }
-""",
+""".replace("REPLACE_MODULE", opt.module),
     )
 
 
-def _scaffold_placeholder(opt: Options, kind: str) -> None:
-    (opt.root / "cmd" / f"{opt.service}-{kind}").mkdir(parents=True, exist_ok=True)
-    (_svc(opt.root) / "adapter" / "in" / kind).mkdir(parents=True, exist_ok=True)
-    _write(
-        opt.root / "cmd" / f"{opt.service}-{kind}" / "main.go",
-        f"""package main
+_MAIN_GO_PLACEHOLDER = """package main
 
 import "REPLACE_MODULE/internal/bootstrap"
 
 func main() {{
 	logger := bootstrap.ComposeFromEnv().Logger
-	logger.WithField("binary", "{opt.service}-{kind}").Info("todo_implement")
+	logger.WithField("binary", "{service}-{kind}").Info("todo_implement")
 }}
-""",
-    )
+"""
 
 
-def _replace_module_placeholders(root: Path, module: str | None) -> None:
-    if module is None:
-        return
-    for path in root.rglob("*.go"):
-        text = path.read_text(encoding="utf-8")
-        if "REPLACE_MODULE" not in text:
-            continue
-        path.write_text(text.replace("REPLACE_MODULE", module), encoding="utf-8")
+def _scaffold_placeholder(opt: Options, kind: str) -> None:
+    _ensure_dir(opt.adapter_in / kind)
+    _write(
+        opt.root / "cmd" / f"{opt.service}-{kind}" / "main.go",
+        _MAIN_GO_PLACEHOLDER.format(service=opt.service, kind=kind).replace("REPLACE_MODULE", opt.module),
+    )
 
 
 def parse_args() -> Options:
@@ -1123,30 +1177,32 @@ def parse_args() -> Options:
     )
     args = parser.parse_args()
 
+    kinds = tuple(k.strip() for k in args.kinds.split(",") if k.strip())
+    unsupported = set(kinds).difference(SUPPORTED_KINDS)
+    if unsupported:
+        parser.error(f"unsupported kind(s): {', '.join(sorted(unsupported))} (supported: {', '.join(SUPPORTED_KINDS)})")
+
     root = Path(args.root).expanduser().resolve()
     root.mkdir(parents=True, exist_ok=True)
-    kinds = tuple(k.strip() for k in args.kinds.split(",") if k.strip())
+    module, go_mod_existed = _read_or_create_go_mod(root, args.module)
     return Options(
         root=root,
-        module=args.module,
+        svc=root / "internal",
+        adapter_in=root / "internal" / "adapter" / "in",
+        module=module,
         service=args.service,
         kinds=kinds,
+        kinds_set=frozenset(kinds),
         http_framework=args.http_framework,
         http_pprof=args.http_pprof,
         http_trace=args.http_trace,
         skip_deps=args.skip_deps,
+        go_mod_created=not go_mod_existed,
     )
 
 
 def main() -> None:
     opt = parse_args()
-    if opt.module is None:
-        opt.module = _discover_module_from_go_mod(opt.root)
-    if opt.module is None and not (opt.root / "go.mod").exists():
-        # Default to local module path based on folder name (avoid assuming github.com-style paths).
-        opt.module = opt.root.name
-
-    go_mod_created = _maybe_write_go_mod(opt.root, opt.module)
     _base_tree(opt)
 
     for kind in opt.kinds:
@@ -1157,13 +1213,11 @@ def main() -> None:
                 _scaffold_http_echo(opt)
             else:
                 raise SystemExit(f"Unsupported http framework: {opt.http_framework}")
-        elif kind in {"grpc", "worker", "cli"}:
+        elif kind in _PLACEHOLDER_KINDS:
             _scaffold_placeholder(opt, kind)
-        else:
-            raise SystemExit(f"Unsupported kind: {kind} (supported: http, grpc, worker, cli)")
 
-    _replace_module_placeholders(opt.root, opt.module)
-    if go_mod_created and not opt.skip_deps:
+    _BATCH.flush()
+    if opt.go_mod_created and not opt.skip_deps:
         print("📦 Installing dependencies (go mod tidy)...")
         _install_deps_for_new_project(opt.root)
 
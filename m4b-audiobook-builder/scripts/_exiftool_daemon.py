@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+
+class ExifToolSession:
+    """One `exiftool -stay_open` process reused for every query in a run.
+
+    Each command is written to exiftool's argument stream followed by a numbered
+    `-execute`, and its output is read up to the matching `{readyN}` marker.
+    Use it as a context manager so the process is always shut down.
+    """
+
+    def __init__(self, executable: str = "exiftool") -> None:
+        self._executable = executable
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._count = 0
+
+    def __enter__(self) -> ExifToolSession:
+        self._process = subprocess.Popen(
+            [self._executable, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        try:
+            process.stdin.write(b"-stay_open\nFalse\n")
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def execute(self, *args: str) -> bytes:
+        if self._process is None:
+            raise RuntimeError("exiftool session is not running")
+        self._count += 1
+        marker = b"{ready%d}" % self._count
+        command = b"".join(os.fsencode(arg) + b"\n" for arg in args)
+        try:
+            self._process.stdin.write(command + b"-execute%d\n" % self._count)
+            self._process.stdin.flush()
+        except BrokenPipeError as exc:
+            raise RuntimeError("exiftool exited before accepting the command") from exc
+
+        # -b output is not newline-terminated, so the marker can follow the payload
+        # directly; only the tail of the buffer is checked on each read.
+        fd = self._process.stdout.fileno()
+        buffer = bytearray()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise RuntimeError("exiftool exited before finishing the command")
+            buffer += chunk
+            if buffer[-len(marker) - 4 :].rstrip().endswith(marker):
+                return bytes(buffer[: buffer.rfind(marker)])
+
+    def read_tags(
+        self,
+        paths: Iterable[Path],
+        tags: Iterable[str],
+        loads: Callable[[bytes], object] = json.loads,
+    ) -> List[dict]:
+        return loads(self.execute("-j", *(f"-{tag}" for tag in tags), *(str(p) for p in paths)))
+
+    def read_binary(self, path: Path, tag: str) -> bytes:
+        return self.execute("-b", f"-{tag}", str(path))
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def default_cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base, "m4b-audiobook-builder", "metadata.json")
+
+
+class MetadataCache:
+    """Per-file metadata remembered across runs, keyed by path.
+
+    An entry is reused only while the file's size and mtime and the tool that
+    produced it (exiftool or ffprobe) are unchanged; anything else, including a
+    malformed entry, is a miss. Without a usable cache location nothing is read
+    or saved.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        try:
+            self.path: Optional[Path] = path or default_cache_path()
+        except (RuntimeError, OSError):
+            # Path.home() fails when HOME is unset and the uid has no passwd entry.
+            self.path = None
+        try:
+            self._entries: Dict[str, dict] = json.loads(self.path.read_bytes()) if self.path else {}
+        except (OSError, ValueError):
+            self._entries = {}
+        if not isinstance(self._entries, dict):
+            self._entries = {}
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def _signature(self, path: str) -> Optional[Tuple[int, int]]:
+        if path not in self._signatures:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._signatures[path] = None
+            else:
+                self._signatures[path] = (st.st_size, st.st_mtime_ns)
+        return self._signatures[path]
+
+    def lookup(
+        self,
+        paths: List[Path],
+        tool: str,
+    ) -> Tuple[Dict[str, Dict[str, object]], List[Path]]:
+        hits: Dict[str, Dict[str, object]] = {}
+        misses: List[Path] = []
+        for path in paths:
+            key = str(path)
+            entry = self._entries.get(key)
+            signature = self._signature(key)
+            if (
+                isinstance(entry, dict)
+                and isinstance(entry.get("info"), dict)
+                and signature is not None
+                and entry.get("tool") == tool
+                and (entry.get("size"), entry.get("mtime_ns")) == signature
+            ):
+                hits[key] = entry["info"]
+            else:
+                misses.append(path)
+        return hits, misses
+
+    def store(self, mapping: Dict[str, Dict[str, object]], tool: str) -> None:
+        if not mapping:
+            return
+        for path, info in mapping.items():
+            signature = self._signature(path)
+            if signature is None:
+                continue
+            self._entries[path] = {
+                "tool": tool,
+                "size": signature[0],
+                "mtime_ns": signature[1],
+                "info": info,
+            }
+        # Files that were moved or deleted since they were cached are dropped so the
+        # cache tracks the libraries in use instead of every path ever scanned.
+        self._entries = {
+            path: entry
+            for path, entry in self._entries.items()
+            if isinstance(entry, dict) and self._signature(path) is not None
+        }
+        self._save()
+
+    def _save(self) -> None:
+        # Write a sibling temp file and rename it so a concurrent reader never sees a
+        # half-written cache; failing to persist only costs the next run a re-read.
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(self._entries, handle, ensure_ascii=False)
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            pass
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import os
+
+
+def probe_workers(count: int) -> int:
+    # Each probe is a separate ffprobe process, so threads overlap their startup and I/O.
+    # Workers mostly wait on child processes, hence more threads than cores.
+    return min(32, (os.cpu_count() or 4) * 2, count)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List
+
+_NATKEY_RE = re.compile(r"\d+")
+
+
+def _natkey_number(match: re.Match[str]) -> str:
+    digits = match.group(0).lstrip("0") or "0"
+    return f"\0{chr(len(digits))}{digits}"
+
+
+def natural_key(text: str) -> str:
+    # Each digit run becomes NUL + a length char + the digits, so plain string comparison
+    # orders numbers by value and sorts "a1" before "a-b", exactly like split-and-int
+    # keys, while list.sort compares single str objects.
+    return _NATKEY_RE.sub(_natkey_number, text.lower())
+
+
+def scan_directory(directory: str) -> tuple[List[tuple[str, str]], List[str]]:
+    # DirEntry.is_file() answers from the directory listing for regular files, so only
+    # symlinks cost an extra stat; it follows them, so broken links are left out.
+    files: List[tuple[str, str]] = []
+    subdirs: List[str] = []
+    with os.scandir(directory) as listing:
+        for entry in listing:
+            if entry.is_file():
+                files.append((directory, entry.name))
+            elif entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    return files, subdirs
+
+
+def scan_subtrees(pending: List[str]) -> List[tuple[str, str]]:
+    # (directory, filename) pairs for every file below the given directories;
+    # unreadable directories are skipped like os.walk does.
+    entries: List[tuple[str, str]] = []
+    while pending:
+        try:
+            files, subdirs = scan_directory(pending.pop())
+        except OSError:
+            continue
+        entries.extend(files)
+        pending.extend(subdirs)
+    return entries
+
+
+def scan_tree(root: Path, recursive: bool) -> List[tuple[str, str]]:
+    # A flat scan of an unreadable root raises; a recursive one treats the root like
+    # any other unreadable directory and returns nothing.
+    try:
+        entries, subdirs = scan_directory(str(root))
+    except OSError:
+        if not recursive:
+            raise
+        return []
+    if recursive:
+        entries.extend(scan_subtrees(subdirs))
+    return entries
+
+
+def collect_files(
+    root: Path,
+    entries: Iterable[tuple[str, str]],
+    extensions: frozenset[str],
+) -> List[Path]:
+    files: List[Path] = []
+    for directory, name in entries:
+        dot = name.rfind(".")
+        if dot > 0 and name[dot:].lower() in extensions:
+            files.append(Path(directory, name))
+
+    # Ties on the natural key fall back to comparing the paths themselves.
+    decorated = [(natural_key(str(p.relative_to(root))), p) for p in files]
+    decorated.sort()
+    return [p for _, p in decorated]
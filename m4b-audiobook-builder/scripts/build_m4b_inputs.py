@@ -2,11 +2,21 @@
 from __future__ import annotations
 
 import argparse
-import re
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Optional
+
+from _probe_pool import probe_workers
+from _tree_scan import collect_files, scan_tree
+
+try:
+    import mutagen
+except ImportError:  # optional: read durations from headers instead of spawning ffprobe
+    mutagen = None
 
 DEFAULT_EXTENSIONS = {
     ".mp3",
@@ -19,33 +29,32 @@ DEFAULT_EXTENSIONS = {
 }
 
 
-def natural_key(text: str) -> List[object]:
-    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", text)]
-
-
-def collect_files(root: Path, recursive: bool, extensions: set[str]) -> List[Path]:
-    if recursive:
-        candidates = [p for p in root.rglob("*") if p.is_file()]
-    else:
-        candidates = [p for p in root.iterdir() if p.is_file()]
-
-    files = [p for p in candidates if p.suffix.lower() in extensions]
-    files.sort(key=lambda p: natural_key(str(p.relative_to(root))))
-    return files
-
-
 def write_concat_list(files: Iterable[Path], output_path: Path) -> None:
+    lines = []
     for path in files:
-        if "'" in str(path):
+        # collect_files joins onto the already-resolved root, so most paths need no resolve().
+        raw = os.fsencode(path if path.is_absolute() else path.resolve())
+        if b"'" in raw:
             raise ValueError(f"file path contains a single quote: {path}")
+        lines.append(b"file '" + raw + b"'\n")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
-        for path in files:
-            handle.write(f"file '{path.resolve()}'\n")
+    output_path.write_bytes(b"".join(lines))
 
 
-def probe_duration_ms(path: Path) -> int:
+def mutagen_duration_ms(path: Path) -> Optional[int]:
+    if mutagen is None:
+        return None
+    try:
+        audio = mutagen.File(path)
+    except mutagen.MutagenError:
+        return None
+    if audio is None or audio.info is None or not audio.info.length:
+        return None
+    return int(round(audio.info.length * 1000))
+
+
+def ffprobe_duration_ms(path: Path) -> int:
     result = subprocess.run(
         [
             "ffprobe",
@@ -60,12 +69,25 @@ def probe_duration_ms(path: Path) -> int:
         check=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
     )
-    seconds = float(result.stdout.strip())
+    seconds = float(result.stdout)
     return int(round(seconds * 1000))
 
 
+def probe_durations_ms(files: List[Path]) -> List[int]:
+    # Header reads are cheap and GIL-bound, so mutagen runs inline; only its misses
+    # pay for an ffprobe process.
+    durations = [mutagen_duration_ms(path) for path in files]
+    missing = [index for index, duration in enumerate(durations) if duration is None]
+    if not missing:
+        return durations
+    with ThreadPoolExecutor(max_workers=probe_workers(len(missing))) as executor:
+        probed = executor.map(ffprobe_duration_ms, [files[index] for index in missing])
+        for index, duration in zip(missing, probed):
+            durations[index] = duration
+    return durations
+
+
 def chapter_title_from_dir(path: Path, root: Path) -> str:
     relative = path.parent.relative_to(root)
     if str(relative) == ".":
@@ -77,57 +99,48 @@ def build_chapters(
     files: List[Path],
     root: Path,
     chapter_mode: str,
+    durations_ms: List[int],
 ) -> List[tuple[int, int, str]]:
     if chapter_mode == "none":
         return []
 
-    durations_ms = [probe_duration_ms(path) for path in files]
-
     if chapter_mode == "file":
-        chapters: List[tuple[int, int, str]] = []
-        start_ms = 0
-        for path, duration_ms in zip(files, durations_ms):
-            end_ms = start_ms + duration_ms
-            chapters.append((start_ms, end_ms, path.stem))
-            start_ms = end_ms
-        return chapters
-
-    chapters = []
+        starts_ms = accumulate(durations_ms, initial=0)
+        ends_ms = accumulate(durations_ms)
+        return list(zip(starts_ms, ends_ms, (path.stem for path in files)))
+
     chapter_starts: List[int] = []
     chapter_titles: List[str] = []
     current_key = None
     cumulative_ms = 0
+    dir_titles: dict[Path, str] = {}
 
     for path, duration_ms in zip(files, durations_ms):
-        dir_title = chapter_title_from_dir(path, root)
+        parent = path.parent
+        dir_title = dir_titles.get(parent)
+        if dir_title is None:
+            dir_title = chapter_title_from_dir(path, root)
+            dir_titles[parent] = dir_title
         if dir_title != current_key:
             chapter_titles.append(dir_title)
             chapter_starts.append(cumulative_ms)
             current_key = dir_title
         cumulative_ms += duration_ms
 
-    total_ms = cumulative_ms
-    for index, title in enumerate(chapter_titles):
-        start_ms = chapter_starts[index]
-        end_ms = chapter_starts[index + 1] if index + 1 < len(chapter_starts) else total_ms
-        chapters.append((start_ms, end_ms, title))
-
-    return chapters
+    chapter_ends = chapter_starts[1:]
+    chapter_ends.append(cumulative_ms)
+    return list(zip(chapter_starts, chapter_ends, chapter_titles))
 
 
 def write_ffmetadata(chapters: List[tuple[int, int, str]], output_path: Path) -> None:
+    blocks = [";FFMETADATA1\n"]
+    for start_ms, end_ms, title in chapters:
+        blocks.append(f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={start_ms}\nEND={end_ms}\ntitle={title}\n")
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
-        handle.write(";FFMETADATA1\n")
-        for start_ms, end_ms, title in chapters:
-            handle.write("[CHAPTER]\n")
-            handle.write("TIMEBASE=1/1000\n")
-            handle.write(f"START={start_ms}\n")
-            handle.write(f"END={end_ms}\n")
-            handle.write(f"title={title}\n")
+    output_path.write_text("".join(blocks), encoding="utf-8")
 
 
-def parse_extensions(value: str) -> set[str]:
+def parse_extensions(value: str) -> frozenset[str]:
     extensions = set()
     for item in value.split(","):
         item = item.strip().lower()
@@ -136,7 +149,7 @@ def parse_extensions(value: str) -> set[str]:
         if not item.startswith("."):
             item = f".{item}"
         extensions.add(item)
-    return extensions
+    return frozenset(extensions)
 
 
 def main() -> int:
@@ -167,7 +180,7 @@ def main() -> int:
     root = Path(args.root).resolve()
     extensions = parse_extensions(args.extensions)
 
-    files = collect_files(root, args.recursive, extensions)
+    files = collect_files(root, scan_tree(root, args.recursive), extensions)
     if not files:
         print("No matching audio files found.", file=sys.stderr)
         return 2
@@ -182,12 +195,13 @@ def main() -> int:
         return 0
 
     try:
-        chapters = build_chapters(files, root, args.chapter_mode)
+        durations_ms = probe_durations_ms(files)
     except subprocess.CalledProcessError as exc:
         print("ffprobe failed; ensure ffmpeg/ffprobe are installed.", file=sys.stderr)
-        print(exc.stderr, file=sys.stderr)
+        print(exc.stderr.decode(errors="replace"), file=sys.stderr)
         return 4
 
+    chapters = build_chapters(files, root, args.chapter_mode, durations_ms)
     write_ffmetadata(chapters, Path(args.meta_out))
     return 0
 
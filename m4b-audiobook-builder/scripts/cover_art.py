@@ -6,9 +6,11 @@ import shutil
 import subprocess
 import sys
 from pathlib import Path
-import re
 from typing import Iterable, List, Optional
 
+from _exiftool_daemon import ExifToolSession
+from _tree_scan import collect_files, natural_key, scan_directory, scan_subtrees
+
 DEFAULT_AUDIO_EXTENSIONS = {
     ".m4b",
     ".m4a",
@@ -34,46 +36,61 @@ DEFAULT_IMAGE_NAMES = {
 EXIFTOOL_TAGS = ["CoverArt", "Picture", "APIC"]
 
 
-def natural_key(text: str) -> List[object]:
-    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\\d+)", text)]
-
-
-def collect_files(root: Path, recursive: bool, extensions: set[str]) -> List[Path]:
-    if recursive:
-        candidates = [p for p in root.rglob("*") if p.is_file()]
-    else:
-        candidates = [p for p in root.iterdir() if p.is_file()]
-    files = [p for p in candidates if p.suffix.lower() in extensions]
-    files.sort(key=lambda p: natural_key(str(p.relative_to(root))))
-    return files
-
-
-def find_sidecar(root: Path, recursive: bool, names: set[str]) -> Optional[Path]:
-    if recursive:
-        candidates = [p for p in root.rglob("*") if p.is_file()]
-    else:
-        candidates = [p for p in root.iterdir() if p.is_file()]
-    matches = [p for p in candidates if p.name.lower() in names]
+def find_sidecar(
+    root: Path,
+    entries: Iterable[tuple[str, str]],
+    names: frozenset[str],
+) -> Optional[Path]:
+    matches = [Path(dirpath, name) for dirpath, name in entries if name.lower() in names]
     if not matches:
         return None
-    matches.sort(key=lambda p: natural_key(str(p.relative_to(root))))
-    return matches[0]
-
-
-def extract_cover_with_exiftool(source: Path, output: Path) -> bool:
-    for tag in EXIFTOOL_TAGS:
-        result = subprocess.run(
-            ["exiftool", "-b", f"-{tag}", str(source)],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        if result.returncode != 0:
-            continue
-        if not result.stdout:
+    return min(matches, key=lambda p: natural_key(str(p.relative_to(root))))
+
+
+def find_embedded_covers(
+    session: ExifToolSession,
+    sources: List[Path],
+) -> List[tuple[Path, List[str]]]:
+    # One query reports which files carry art; without -b binary tags come back as short
+    # "(Binary data ...)" placeholders rather than the image bytes. A file the report does
+    # not cover (it failed to decode, or exiftool could not echo a non-UTF-8 name back)
+    # keeps every tag as a candidate and is probed with -b like any other.
+    if not sources:
+        return []
+    try:
+        records = session.read_tags(sources, EXIFTOOL_TAGS)
+    except RuntimeError:
+        return []
+    except ValueError:
+        records = []
+
+    tags_by_source: dict[str, List[str]] = {}
+    for record in records:
+        tags_by_source[record.get("SourceFile")] = [tag for tag in EXIFTOOL_TAGS if record.get(tag)]
+
+    covers = []
+    for source in sources:
+        tags = tags_by_source.get(str(source), EXIFTOOL_TAGS)
+        if tags:
+            covers.append((source, tags))
+    return covers
+
+
+def extract_cover_with_exiftool(
+    session: ExifToolSession,
+    source: Path,
+    output: Path,
+    tags: Iterable[str] = EXIFTOOL_TAGS,
+) -> bool:
+    for tag in tags:
+        try:
+            data = session.read_binary(source, tag)
+        except RuntimeError:
+            return False
+        if not data:
             continue
         output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_bytes(result.stdout)
+        output.write_bytes(data)
         if output.stat().st_size > 0:
             return True
     return False
@@ -83,30 +100,42 @@ def extract_cover(
     root: Path,
     recursive: bool,
     output: Path,
-    image_names: set[str],
-    extensions: set[str],
+    image_names: frozenset[str],
+    extensions: frozenset[str],
 ) -> Optional[Path]:
-    sidecar = find_sidecar(root, recursive, image_names)
+    # Covers almost always sit next to the audio, so the top level is checked before
+    # paying for a walk of the whole tree. A recursive run tolerates an unreadable root
+    # the same way it tolerates unreadable subdirectories.
+    try:
+        entries, subdirs = scan_directory(str(root))
+    except OSError:
+        if not recursive:
+            raise
+        entries, subdirs = [], []
+    sidecar = find_sidecar(root, entries, image_names)
+    if sidecar is None and recursive:
+        entries.extend(scan_subtrees(subdirs))
+        sidecar = find_sidecar(root, entries, image_names)
     if sidecar:
         output.parent.mkdir(parents=True, exist_ok=True)
-        if sidecar.resolve() != output.resolve():
+        try:
             shutil.copyfile(sidecar, output)
+        except shutil.SameFileError:
+            # --output already is the sidecar.
+            pass
         return output
 
     if not shutil.which("exiftool"):
         return None
 
-    audio_files = collect_files(root, recursive, extensions)
-    audio_files.sort(
-        key=lambda p: (
-            0 if p.suffix.lower() == ".m4b" else 1,
-            natural_key(str(p.relative_to(root))),
-        )
-    )
+    # Stable sort: .m4b first, natural order otherwise.
+    audio_files = collect_files(root, entries, extensions)
+    audio_files.sort(key=lambda p: 0 if p.suffix.lower() == ".m4b" else 1)
 
-    for path in audio_files:
-        if extract_cover_with_exiftool(path, output):
-            return output
+    with ExifToolSession() as session:
+        for path, tags in find_embedded_covers(session, audio_files):
+            if extract_cover_with_exiftool(session, path, output, tags):
+                return output
 
     return None
 
@@ -126,7 +155,7 @@ def embed_cover(cover: Path, target: Path) -> bool:
     return result.returncode == 0
 
 
-def parse_extensions(value: str) -> set[str]:
+def parse_extensions(value: str) -> frozenset[str]:
     extensions = set()
     for item in value.split(","):
         item = item.strip().lower()
@@ -135,16 +164,16 @@ def parse_extensions(value: str) -> set[str]:
         if not item.startswith("."):
             item = f".{item}"
         extensions.add(item)
-    return extensions
+    return frozenset(extensions)
 
 
-def parse_image_names(value: str) -> set[str]:
+def parse_image_names(value: str) -> frozenset[str]:
     names = set()
     for item in value.split(","):
         item = item.strip().lower()
         if item:
             names.add(item)
-    return names
+    return frozenset(names)
 
 
 def main() -> int:
@@ -3,14 +3,42 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from _exiftool_daemon import ExifToolSession
+from _metadata_cache import MetadataCache
+from _probe_pool import probe_workers
+from _tree_scan import collect_files, natural_key, scan_tree
+
+try:
+    import orjson
+except ImportError:  # optional: faster parsing of large exiftool/ffprobe reports
+    orjson = None
 
 DEFAULT_EXTENSIONS = {".m4b"}
+EXIFTOOL_MIN_CHUNK = 64
+# Without -b, exiftool reports binary tags (CoverArt/Picture/APIC) as a short
+# "(Binary data N bytes, ...)" string, so asking for them only costs a presence check.
+EXIFTOOL_TAGS = [
+    "TrackNumber",
+    "DiskNumber",
+    "Title",
+    "Album",
+    "Artist",
+    "AlbumArtist",
+    "Duration",
+    "CoverArt",
+    "Picture",
+    "APIC",
+    "FileName",
+]
 DEFAULT_IMAGE_NAMES = {
     "cover.jpg",
     "cover.jpeg",
@@ -23,9 +51,7 @@ DEFAULT_IMAGE_NAMES = {
     "artwork.png",
 }
 
-
-def natural_key(text: str) -> List[object]:
-    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", text)]
+_DIGIT_RE = re.compile(r"\d+")
 
 
 def parse_index(value: object) -> Optional[int]:
@@ -34,52 +60,41 @@ def parse_index(value: object) -> Optional[int]:
     if isinstance(value, (int, float)):
         return int(value)
     text = str(value)
-    match = re.search(r"\d+", text)
+    match = _DIGIT_RE.search(text)
     if not match:
         return None
     return int(match.group(0))
 
 
-def collect_files(root: Path, recursive: bool, extensions: set[str]) -> List[Path]:
-    if recursive:
-        candidates = [p for p in root.rglob("*") if p.is_file()]
+def _json_loads(data: str | bytes) -> object:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_exiftool_chunk(paths: List[Path]) -> List[dict]:
+    with ExifToolSession() as session:
+        return session.read_tags(paths, EXIFTOOL_TAGS, loads=_json_loads)
+
+
+def load_exiftool(paths: List[Path]) -> Dict[str, Dict[str, object]]:
+    # Tag decoding happens in the exiftool processes, so threads are enough to run
+    # several of them at once; small sets stay on one process to skip extra startups.
+    workers = max(1, min(os.cpu_count() or 1, len(paths) // EXIFTOOL_MIN_CHUNK))
+    if workers == 1:
+        data = _read_exiftool_chunk(paths)
     else:
-        candidates = [p for p in root.iterdir() if p.is_file()]
-    files = [p for p in candidates if p.suffix.lower() in extensions]
-    files.sort(key=lambda p: natural_key(str(p.relative_to(root))))
-    return files
-
-
-def load_exiftool(paths: List[Path]) -> Dict[Path, Dict[str, object]]:
-    args = [
-        "exiftool",
-        "-j",
-        "-TrackNumber",
-        "-DiskNumber",
-        "-Title",
-        "-Album",
-        "-Artist",
-        "-AlbumArtist",
-        "-Duration",
-        "-CoverArt",
-        "-Picture",
-        "-APIC",
-        "-FileName",
-    ] + [str(p) for p in paths]
-    result = subprocess.run(
-        args,
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    data = json.loads(result.stdout)
-    mapping: Dict[Path, Dict[str, object]] = {}
+        size = -(-len(paths) // workers)
+        chunks = [paths[start : start + size] for start in range(0, len(paths), size)]
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            data = [item for records in executor.map(_read_exiftool_chunk, chunks) for item in records]
+    mapping: Dict[str, Dict[str, object]] = {}
     for item in data:
         source = item.get("SourceFile")
         if not source:
             continue
-        mapping[Path(source)] = item
+        mapping[source] = item
     return mapping
 
 
@@ -98,9 +113,8 @@ def load_ffprobe(path: Path) -> Dict[str, object]:
         check=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
     )
-    data = json.loads(result.stdout)
+    data = _json_loads(result.stdout)
     tags = (data.get("format") or {}).get("tags") or {}
     duration = (data.get("format") or {}).get("duration")
     return {
@@ -115,37 +129,67 @@ def load_ffprobe(path: Path) -> Dict[str, object]:
     }
 
 
-def load_metadata(paths: List[Path]) -> Dict[Path, Dict[str, object]]:
+def _load_ffprobe_or_error(path: Path) -> Tuple[Optional[Dict[str, object]], Optional[Exception]]:
+    try:
+        return load_ffprobe(path), None
+    except (subprocess.CalledProcessError, json.JSONDecodeError) as exc:
+        return None, exc
+
+
+def load_ffprobe_batch(paths: List[Path]) -> Dict[str, Dict[str, object]]:
+    # Failures are reported in part order once all probes are back.
+    mapping: Dict[str, Dict[str, object]] = {}
+    with ThreadPoolExecutor(max_workers=probe_workers(len(paths))) as executor:
+        results = executor.map(_load_ffprobe_or_error, paths)
+        for path, (info, exc) in zip(paths, results):
+            if exc is not None:
+                print(f"ffprobe failed for {path}: {exc}", file=sys.stderr)
+                continue
+            mapping[str(path)] = info
+    return mapping
+
+
+def load_metadata(
+    paths: List[Path],
+    cache: Optional[MetadataCache] = None,
+) -> Dict[str, Dict[str, object]]:
     if shutil.which("exiftool"):
+        mapping, pending = cache.lookup(paths, "exiftool") if cache else ({}, paths)
         try:
-            return load_exiftool(paths)
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as exc:
-            print("exiftool failed, falling back to ffprobe.", file=sys.stderr)
-            if isinstance(exc, subprocess.CalledProcessError):
-                print(exc.stderr, file=sys.stderr)
+            fresh = load_exiftool(pending) if pending else {}
+        except (RuntimeError, json.JSONDecodeError) as exc:
+            print(f"exiftool failed ({exc}), falling back to ffprobe.", file=sys.stderr)
+        else:
+            if cache:
+                cache.store(fresh, "exiftool")
+            mapping.update(fresh)
+            return mapping
     if not shutil.which("ffprobe"):
         raise RuntimeError("ffprobe is required when exiftool is unavailable.")
 
-    mapping: Dict[Path, Dict[str, object]] = {}
-    for path in paths:
-        try:
-            mapping[path] = load_ffprobe(path)
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as exc:
-            print(f"ffprobe failed for {path}: {exc}", file=sys.stderr)
+    mapping, pending = cache.lookup(paths, "ffprobe") if cache else ({}, paths)
+    fresh = load_ffprobe_batch(pending) if pending else {}
+    if cache:
+        cache.store(fresh, "ffprobe")
+    mapping.update(fresh)
     return mapping
 
 
 def compute_order(
     files: List[Path],
-    metadata: Dict[Path, Dict[str, object]],
-    root: Path,
+    metadata: Dict[str, Dict[str, object]],
 ) -> Tuple[List[Path], List[str]]:
     warnings: List[str] = []
+    # Untagged part sets are common; skip parsing every tag when none has a track.
+    if not any(metadata.get(str(path), {}).get("TrackNumber") is not None for path in files):
+        warnings.append("No track numbers detected; falling back to filename order.")
+        return files, warnings
+
     entries = []
     has_track = False
     missing_track = False
     for path in files:
-        info = metadata.get(path, {})
+        info = metadata.get(str(path), {})
         track = parse_index(info.get("TrackNumber"))
         disc = parse_index(info.get("DiskNumber")) or 1
         if track is None:
@@ -157,12 +201,13 @@ def compute_order(
     if has_track:
         if missing_track:
             warnings.append("Some files are missing track numbers; ordering may be incomplete.")
+        # entries follow files, which collect_files already put in natural order; the
+        # stable sort keeps that order for equal (disc, track) pairs.
         ordered = sorted(
             entries,
             key=lambda item: (
                 item[1],
                 item[2] if item[2] is not None else 10**9,
-                natural_key(str(item[0].relative_to(root))),
             ),
         )
         return [item[0] for item in ordered], warnings
@@ -182,12 +227,12 @@ def metadata_score(info: Dict[str, object]) -> int:
 
 def choose_metadata_source(
     ordered: List[Path],
-    metadata: Dict[Path, Dict[str, object]],
+    metadata: Dict[str, Dict[str, object]],
 ) -> Optional[Path]:
     best_path = None
     best_score = -1
     for path in ordered:
-        score = metadata_score(metadata.get(path, {}))
+        score = metadata_score(metadata.get(str(path), {}))
         if score > best_score:
             best_score = score
             best_path = path
@@ -204,31 +249,32 @@ def has_embedded_cover(info: Dict[str, object]) -> bool:
     return False
 
 
-def find_sidecar(root: Path, recursive: bool, names: set[str]) -> Optional[Path]:
-    if recursive:
-        candidates = [p for p in root.rglob("*") if p.is_file()]
-    else:
-        candidates = [p for p in root.iterdir() if p.is_file()]
-    matches = [p for p in candidates if p.name.lower() in names]
+def find_sidecar(
+    root: Path,
+    entries: Iterable[tuple[str, str]],
+    names: frozenset[str],
+) -> Optional[Path]:
+    matches = [(dirpath, name) for dirpath, name in entries if name.lower() in names]
     if not matches:
         return None
-    matches.sort(key=lambda p: natural_key(str(p.relative_to(root))))
-    return matches[0]
+    # Like cover_art.py, a cover next to the parts wins over any in subdirectories.
+    directory = str(root)
+    top_level = [match for match in matches if match[0] == directory]
+    candidates = [Path(dirpath, name) for dirpath, name in top_level or matches]
+    return min(candidates, key=lambda p: natural_key(str(p.relative_to(root))))
 
 
 def choose_cover_source(
     root: Path,
-    recursive: bool,
+    sidecar: Optional[Path],
     ordered: List[Path],
-    metadata: Dict[Path, Dict[str, object]],
-    image_names: set[str],
+    metadata: Dict[str, Dict[str, object]],
 ) -> Optional[str]:
-    sidecar = find_sidecar(root, recursive, image_names)
     if sidecar:
         return f"sidecar:{sidecar.relative_to(root)}"
 
     for path in ordered:
-        info = metadata.get(path, {})
+        info = metadata.get(str(path), {})
         if has_embedded_cover(info):
             return f"embedded:{path.relative_to(root)}"
     return None
@@ -236,7 +282,7 @@ def choose_cover_source(
 
 def format_summary(
     ordered: List[Path],
-    metadata: Dict[Path, Dict[str, object]],
+    metadata: Dict[str, Dict[str, object]],
     root: Path,
     warnings: List[str],
     metadata_source: Optional[Path],
@@ -245,7 +291,7 @@ def format_summary(
     lines = []
     lines.append("Proposed order:")
     for idx, path in enumerate(ordered, start=1):
-        info = metadata.get(path, {})
+        info = metadata.get(str(path), {})
         track = info.get("TrackNumber")
         disc = info.get("DiskNumber")
         title = info.get("Title")
@@ -288,16 +334,18 @@ def format_summary(
 
 
 def write_concat_list(ordered: List[Path], output_path: Path) -> None:
+    lines = []
     for path in ordered:
-        if "'" in str(path):
+        raw = os.fsencode(path.resolve())
+        if b"'" in raw:
             raise ValueError(f"file path contains a single quote: {path}")
+        lines.append(b"file '" + raw + b"'\n")
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
-        for path in ordered:
-            handle.write(f"file '{path.resolve()}'\n")
+    output_path.write_bytes(b"".join(lines))
 
 
-def parse_extensions(value: str) -> set[str]:
+def parse_extensions(value: str) -> frozenset[str]:
     extensions = set()
     for item in value.split(","):
         item = item.strip().lower()
@@ -306,16 +354,16 @@ def parse_extensions(value: str) -> set[str]:
         if not item.startswith("."):
             item = f".{item}"
         extensions.add(item)
-    return extensions
+    return frozenset(extensions)
 
 
-def parse_names(value: str) -> set[str]:
+def parse_names(value: str) -> frozenset[str]:
     names = set()
     for item in value.split(","):
         item = item.strip().lower()
         if item:
             names.add(item)
-    return names
+    return frozenset(names)
 
 
 def main() -> int:
@@ -342,26 +390,34 @@ def main() -> int:
         "--files-out",
         help="Optional path to write ffmpeg concat list in proposed order.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-read all metadata instead of reusing results cached from earlier runs.",
+    )
 
     args = parser.parse_args()
     root = Path(args.root).resolve()
     extensions = parse_extensions(args.extensions)
     image_names = parse_names(args.image_names)
 
-    files = collect_files(root, args.recursive, extensions)
+    # Listed once and reused for both the part files and the sidecar search.
+    entries = scan_tree(root, args.recursive)
+    files = collect_files(root, entries, extensions)
     if not files:
         print("No matching M4B files found.", file=sys.stderr)
         return 2
 
     try:
-        metadata = load_metadata(files)
+        metadata = load_metadata(files, None if args.no_cache else MetadataCache())
     except RuntimeError as exc:
         print(str(exc), file=sys.stderr)
         return 3
 
-    ordered, warnings = compute_order(files, metadata, root)
+    ordered, warnings = compute_order(files, metadata)
     metadata_source = choose_metadata_source(ordered, metadata)
-    cover_source = choose_cover_source(root, args.recursive, ordered, metadata, image_names)
+    sidecar = find_sidecar(root, entries, image_names)
+    cover_source = choose_cover_source(root, sidecar, ordered, metadata)
     print(format_summary(ordered, metadata, root, warnings, metadata_source, cover_source))
 
     if args.files_out: